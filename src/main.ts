@@ -1,3 +1,5 @@
+import { Agent } from 'https';
+
 import * as core from '@actions/core';
 import * as github from '@actions/github';
 import { WebClient, retryPolicies } from '@slack/web-api';
@@ -19,10 +21,15 @@ import { stringify, normalizeError } from './utils';
 function formatUserMapping(mapping: string): Record<string, string> {
   try {
     const data = JSON.parse(mapping) as Record<string, string>;
-    return Object.keys(data).reduce((r, k) => {
+    const result: Record<string, string> = {};
+
+    // fill a single object instead of spreading a new copy per key
+    Object.keys(data).forEach((k) => {
       const value = data[k];
-      return value ? { ...r, [k]: value } : r;
-    }, {});
+      if (value) result[k] = value;
+    });
+
+    return result;
   } catch {
     throw new Error('Input "user-mapping" must be a json string.');
   }
@@ -93,7 +100,11 @@ function isValidEvent(): boolean {
 }
 
 (async function run(): Promise<void> {
-  core.debug(`GitHub context: ${stringify(github.context)}`);
+  // the context holds the whole event payload, only serialize it when it is
+  // going to be shown
+  if (core.isDebug()) {
+    core.debug(`GitHub context: ${stringify(github.context)}`);
+  }
 
   if (!isValidEvent()) {
     core.debug('Invalid Event.');
@@ -110,6 +121,11 @@ function isValidEvent(): boolean {
       );
     }
 
+    // passed down explicitly like the Slack clients, used by getPullRequestDetail
+    const octokit = input.githubToken
+      ? github.getOctokit(input.githubToken)
+      : null;
+
     if (input.botToken.length > 0) {
       if (input.channelId.length === 0) {
         throw new Error(
@@ -117,20 +133,28 @@ function isValidEvent(): boolean {
         );
       }
 
+      // reuse one TLS connection for postMessage and addReaction
+      const agent = new Agent({ keepAlive: true, maxSockets: 1 });
       const web = new WebClient(input.botToken, {
+        agent,
         retryConfig: retryPolicies.fiveRetriesInFiveMinutes,
       });
-      const response = await postMessage({ web, input });
-
-      if (
-        response.ts &&
-        response.metadata_scopes?.includes('reactions:write')
-      ) {
-        await addReaction({
-          web,
-          input,
-          timestamp: response.ts,
-        });
+
+      try {
+        const response = await postMessage({ web, input, octokit });
+
+        if (
+          response.ts &&
+          response.metadata_scopes?.includes('reactions:write')
+        ) {
+          await addReaction({
+            web,
+            input,
+            timestamp: response.ts,
+          });
+        }
+      } finally {
+        agent.destroy();
       }
 
       return;
@@ -142,6 +166,7 @@ function isValidEvent(): boolean {
       await postMessageWithWebhook({
         webhook,
         input,
+        octokit,
       });
     }
   } catch (error) {
@@ -10,20 +10,60 @@ import type {
   TRepository,
   TPullRequestWebhookEventPayload,
   TPullRequestReviewWebhookEventPayload,
+  TPullRequestDetail,
+  TPullRequestDetailQuery,
   TIssueCommentWebhookEventPayload,
   TPullRequestReviewSubmittedWebhookEventPayload,
+  TOctokit,
 } from './types';
-import { stringify } from './utils';
+import { stringify, normalizeError } from './utils';
 
 const DEFAULT_TEXT = 'This is a message from a github pull request.';
 
+const REACTION_ICONS = [
+  'heart',
+  'heart_eyes',
+  'smiling_face_with_3_hearts',
+  'medal',
+  '100',
+];
+
+const PULL_REQUEST_DETAIL_QUERY = `
+  query ($owner: String!, $repo: String!, $pull_number: Int!) {
+    repository(owner: $owner, name: $repo) {
+      pullRequest(number: $pull_number) {
+        headRefName
+        headRepository {
+          url
+        }
+        baseRefName
+        baseRepository {
+          url
+        }
+        reviewRequests(first: 100) {
+          nodes {
+            requestedReviewer {
+              ... on User {
+                login
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+`;
+
 /**
  * Generates full branch URL
  * @param {Object} repository - git repository information
  * @param {string} name - branch name
  * @returns {string}
  */
-function generateBranchURL(repository: TRepository, name: string): string {
+function generateBranchURL(
+  repository: Pick<TRepository, 'html_url'> | null,
+  name: string
+): string {
   return `${repository?.html_url}/tree/${name}`;
 }
 
@@ -69,23 +109,68 @@ function getRequestedReviewers(
 
 /**
  * Gets pull request detail
- * @param {Object} {token,owner,repo,pull_number}
+ * Asks the GraphQL API for only the fields rendered in the message and falls
+ * back to the REST API when GraphQL is unavailable (e.g. older GHE servers) or
+ * returns no pull request.
+ * @param {Object} {octokit,owner,repo,pull_number}
  * @returns {Promise}
  */
 async function getPullRequestDetail({
-  token,
+  octokit,
   owner,
   repo,
   pull_number,
 }: {
-  token: TInput['githubToken'];
+  octokit: TOctokit | null;
   owner: string;
   repo: string;
   pull_number: number;
-}): Promise<TPullRequestWebhookEventPayload['pull_request'] | null> {
-  if (!token) return null;
+}): Promise<TPullRequestDetail | null> {
+  if (!octokit) return null;
+
+  let pullRequest: TPullRequestDetailQuery['repository']['pullRequest'] =
+    null;
+
+  try {
+    const response = await octokit.graphql<TPullRequestDetailQuery>(
+      PULL_REQUEST_DETAIL_QUERY,
+      { owner, repo, pull_number }
+    );
+    pullRequest = response.repository.pullRequest;
+  } catch (error) {
+    const { status, errors } = error as { status?: number; errors?: unknown };
+
+    // only a missing endpoint or a rejected query (e.g. an older GHE schema)
+    // falls back to REST, auth and network failures are not retried
+    if (status !== 404 && !Array.isArray(errors)) throw error;
+
+    core.debug(
+      `Action: slack.getPullRequestDetail: GraphQL request failed, falling back to REST: ${normalizeError(
+        error
+      )}`
+    );
+  }
+
+  if (pullRequest) {
+    return {
+      head: {
+        ref: pullRequest.headRefName,
+        repo: pullRequest.headRepository
+          ? { html_url: pullRequest.headRepository.url }
+          : null,
+      },
+      base: {
+        ref: pullRequest.baseRefName,
+        repo: pullRequest.baseRepository
+          ? { html_url: pullRequest.baseRepository.url }
+          : null,
+      },
+      requested_reviewers: pullRequest.reviewRequests.nodes
+        .map((node) => node.requestedReviewer?.login)
+        .filter((login): login is string => Boolean(login)),
+    };
+  }
 
-  const octokit = github.getOctokit(token);
   const { data } = await octokit.rest.pulls.get({
     owner,
     repo,
@@ -93,15 +178,25 @@ async function getPullRequestDetail({
     mediaType: { format: 'json' },
   });
 
-  return data as TPullRequestWebhookEventPayload['pull_request'];
+  return {
+    head: { ref: data.head.ref, repo: data.head.repo },
+    base: { ref: data.base.ref, repo: data.base.repo },
+    requested_reviewers: (data.requested_reviewers ?? []).map(
+      ({ login }) => login
+    ),
+  };
 }
 
 /**
  * Builds message content
  * @param {Object} input - action inputs
+ * @param {Object|null} octokit - shared GitHub client, null when no token is provided
  * @returns {Promise} promise represents object of {blocks, attachments}
  */
-async function buildMessageContent(input: TInput): Promise<{
+async function buildMessageContent(
+  input: TInput,
+  octokit: TOctokit | null
+): Promise<{
   blocks: KnownBlock[];
   attachments: MessageAttachment[];
 }> {
@@ -203,20 +298,8 @@ async function buildMessageContent(input: TInput): Promise<{
         input.userMapping
       );
       eventStatus = 'review: ';
-
-      const pullRequestDetail = await getPullRequestDetail({
-        token: input.githubToken,
-        owner: github.context.repo.owner,
-        repo: github.context.repo.repo,
-        pull_number: pullRequestNumber,
-      });
-
-      if (pullRequestDetail) {
-        changedFiles = [
-          `${pullRequestDetail.html_url}/files`,
-          pullRequestDetail.changed_files,
-        ];
-      }
+      // the review payload already carries everything rendered below, the
+      // pull request detail would only add `changed_files` which is not shown
 
       if (action === 'submitted') {
         const {
@@ -270,10 +353,12 @@ async function buildMessageContent(input: TInput): Promise<{
       messageURL = comment.html_url;
       labels = issue.labels.map((label) => label.name);
 
+      // `context.repo` is a getter that re-reads and splits GITHUB_REPOSITORY
+      const { owner, repo } = github.context.repo;
       const pullRequestDetail = await getPullRequestDetail({
-        token: input.githubToken,
-        owner: github.context.repo.owner,
-        repo: github.context.repo.repo,
+        octokit,
+        owner,
+        repo,
         pull_number: pullRequestNumber,
       });
 
@@ -289,19 +374,9 @@ async function buildMessageContent(input: TInput): Promise<{
           generateBranchURL(pullRequestDetail.base.repo, baseBranchName),
           baseBranchName,
         ];
-        createdBy = pullRequestDetail.user?.login;
-
-        changedFiles = [
-          `${pullRequestDetail.html_url}/files`,
-          pullRequestDetail.changed_files,
-        ];
-
-        if (pullRequestDetail.requested_reviewers) {
-          requestedReviewers = getRequestedReviewers(
-            pullRequestDetail.requested_reviewers as TRequestedReviewers,
-            input.userMapping
-          );
-        }
+        requestedReviewers = pullRequestDetail.requested_reviewers.map(
+          (login) => generateUser(login, input.userMapping)
+        );
       }
 
       if (action === 'created') {
@@ -471,24 +546,40 @@ async function buildMessageContent(input: TInput): Promise<{
   };
 }
 
+/**
+ * Logs a Slack http response
+ * The response is only serialized when debug logging is enabled.
+ * @param {string} action - name of the calling action
+ * @param {Object} response - http response received from Slack
+ */
+function debugResponse(action: string, response: Record<string, any>): void {
+  if (!core.isDebug()) return;
+
+  core.debug(
+    `Action: slack.${action}: http response received: ${stringify(response)}`
+  );
+}
+
 /**
  * Posts a message to slack
- * @param {Object} {web,input} - web: instance of Slack API, input: action inputs
+ * @param {Object} {web,input,octokit} - web: instance of Slack API, input: action inputs, octokit: shared GitHub client
  * @returns {Promise} promise represents object of {ts: Slack timestamp ID, metadata_scopes: app scopes}
  */
 export async function postMessage({
   web,
   input,
+  octokit,
 }: {
   web: WebClient;
   input: TInput;
+  octokit: TOctokit | null;
 }): Promise<{
   ts: string | undefined;
   metadata_scopes: string[] | undefined;
 }> {
   core.info('Action: slack.postMessage: sending a message.');
 
-  const content = await buildMessageContent(input);
+  const content = await buildMessageContent(input, octokit);
   const response = await web.chat.postMessage({
     channel: input.channelId,
     text: DEFAULT_TEXT,
@@ -496,9 +587,7 @@ export async function postMessage({
   });
 
   core.info('Action: slack.postMessage: sent to Slack.');
-  core.debug(
-    `Action: slack.postMessage: http response received: ${stringify(response)}`
-  );
+  debugResponse('postMessage', response);
 
   return {
     ts: response.ts,
@@ -520,13 +609,8 @@ export async function addReaction({
   input: TInput;
   timestamp: string;
 }): Promise<void> {
-  const iconName = [
-    'heart',
-    'heart_eyes',
-    'smiling_face_with_3_hearts',
-    'medal',
-    '100',
-  ][Math.floor(Math.random() * 5)];
+  const iconName =
+    REACTION_ICONS[Math.floor(Math.random() * REACTION_ICONS.length)];
 
   core.info('Action: slack.addReaction: sending a message.');
 
@@ -537,35 +621,31 @@ export async function addReaction({
   });
 
   core.info('Action: slack.addReaction: sent to Slack.');
-  core.debug(
-    `Action: slack.addReaction: http response received: ${stringify(response)}`
-  );
+  debugResponse('addReaction', response);
 }
 
 /**
  * Posts a message to slack using Incoming Webhook
- * @param {Object} {web,input} - webhook: instance of Slack Incoming Webhook, input: action inputs
+ * @param {Object} {webhook,input,octokit} - webhook: instance of Slack Incoming Webhook, input: action inputs, octokit: shared GitHub client
  * @returns {Promise}
  */
 export async function postMessageWithWebhook({
   webhook,
   input,
+  octokit,
 }: {
   webhook: IncomingWebhook;
   input: TInput;
+  octokit: TOctokit | null;
 }): Promise<void> {
   core.info('Action: slack.postMessageWithWebhook: sending a message.');
 
-  const content = await buildMessageContent(input);
+  const content = await buildMessageContent(input, octokit);
   const response = await webhook.send({
     text: DEFAULT_TEXT,
     ...content,
   });
 
   core.info('Action: slack.postMessageWithWebhook: sent to Slack.');
-  core.debug(
-    `Action: slack.postMessageWithWebhook: http response received: ${stringify(
-      response
-    )}`
-  );
+  debugResponse('postMessageWithWebhook', response);
 }
@@ -1,3 +1,4 @@
+import type { getOctokit } from '@actions/github';
 import type { EmitterWebhookEvent } from '@octokit/webhooks';
 
 export type TInput = {
@@ -35,3 +36,30 @@ export type TRequestedReviewers =
   TPullRequestWebhookEventPayload['pull_request']['requested_reviewers'];
 
 export type TRepository = TPullRequestWebhookEventPayload['repository'];
+
+type TPullRequestDetailBranch = {
+  ref: string;
+  repo: Pick<TRepository, 'html_url'> | null;
+};
+
+export type TPullRequestDetail = {
+  head: TPullRequestDetailBranch;
+  base: TPullRequestDetailBranch;
+  requested_reviewers: string[];
+};
+
+export type TPullRequestDetailQuery = {
+  repository: {
+    pullRequest: {
+      headRefName: string;
+      headRepository: { url: string } | null;
+      baseRefName: string;
+      baseRepository: { url: string } | null;
+      reviewRequests: {
+        nodes: { requestedReviewer: { login?: string } | null }[];
+      };
+    } | null;
+  };
+};
+
+export type TOctokit = ReturnType<typeof getOctokit>;
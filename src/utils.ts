@@ -7,5 +7,16 @@ export const isUndefined = (value: any): value is undefined =>
 export const normalizeError = (error: any) => {
   if (typeof error === 'string') return error;
   if (error instanceof Error) return error.message;
-  return stringify(error);
+
+  // a circular or otherwise unserializable value must not mask the real error
+  try {
+    return stringify(error);
+  } catch {
+    // String() throws too for null-prototype objects and bad toString overrides
+    try {
+      return String(error);
+    } catch {
+      return 'Unknown error';
+    }
+  }
 };